@@ -1,43 +1,238 @@
+import atexit
+import collections
+import queue
 import random
+import threading
 import time
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
 import smtplib
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import tkinter as tk
 from tkinter import ttk, messagebox
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 import sqlite3
 import json
 
+try:
+    from numba import njit
+except ImportError:  # numba est optionnel : repli sur NumPy
+    njit = None
+
+# Les datetime passés en paramètre SQL sont stockés en secondes Unix, comme les colonnes timestamp
+sqlite3.register_adapter(datetime, lambda d: int(d.timestamp()))
+
+def _scan_glucose_loop(glucose, hypo, hyper, sev):
+    """Parcourt une fois la série : épisodes, moyenne, extrêmes, sorties de cible et temps dans la cible"""
+    hypo_count = 0
+    hyper_count = 0
+    sev_count = 0
+    in_range = 0
+    n_crossings = 0
+    total = 0.0
+    low = glucose[0]
+    high = glucose[0]
+    was_out = False
+    for i in range(glucose.shape[0]):
+        value = glucose[i]
+        total += value
+        if value < low:
+            low = value
+        if value > high:
+            high = value
+        
+        out = True
+        if value < hypo:
+            hypo_count += 1
+        elif value > hyper:
+            hyper_count += 1
+            if value > sev:
+                sev_count += 1
+        else:
+            in_range += 1
+            out = False
+        
+        # Compter chaque sortie de la plage cible
+        if out and not was_out:
+            n_crossings += 1
+        was_out = out
+    
+    return hypo_count, hyper_count, sev_count, total / glucose.shape[0], low, high, n_crossings, in_range
+
+def _scan_glucose_numpy(glucose, hypo, hyper, sev):
+    """Équivalent vectorisé de _scan_glucose_loop, utilisé sans numba"""
+    below = glucose < hypo
+    above = glucose > hyper
+    out = below | above
+    n_crossings = int(out[0]) + int(np.count_nonzero(out[1:] & ~out[:-1]))
+    return (int(np.count_nonzero(below)), int(np.count_nonzero(above)), int(np.count_nonzero(glucose > sev)),
+            glucose.mean(dtype=np.float64), glucose.min(), glucose.max(), n_crossings,
+            int(glucose.shape[0] - np.count_nonzero(out)))
+
+scan_glucose = njit(cache=True)(_scan_glucose_loop) if njit is not None else _scan_glucose_numpy
+
+class GlucoseBuffer:
+    """Tampon circulaire préalloué des mesures de glycémie (un tableau par champ)"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # float64 : la dernière mesure est relue exactement pour le calcul de tendance
+        self.glucose = np.empty(capacity, dtype=np.float64)
+        self.ts = np.empty(capacity, dtype='datetime64[s]')
+        self.head = 0   # prochain emplacement à écrire
+        self.count = 0  # nombre de mesures valides
+    
+    def __len__(self):
+        return self.count
+    
+    def append(self, timestamp, value):
+        """Ajoute une mesure en écrasant la plus ancienne si le tampon est plein"""
+        self.glucose[self.head] = value
+        self.ts[self.head] = np.datetime64(timestamp, 's')
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def last_value(self):
+        """Renvoie la dernière mesure, ou None si le tampon est vide"""
+        if self.count == 0:
+            return None
+        return float(self.glucose[self.head - 1])
+    
+    def last(self, n):
+        """Renvoie les n dernières mesures, de la plus ancienne à la plus récente"""
+        n = min(n, self.count)
+        start = self.head - n
+        if start >= 0:
+            return self.glucose[start:self.head]
+        if self.head == 0:
+            return self.glucose[start:]
+        # Copie uniquement lorsque la fenêtre chevauche la fin du tampon
+        return np.concatenate((self.glucose[start:], self.glucose[:self.head]))
+
 class DiabeticPatientMonitor:
+    # Taille maximale d'un lot d'écriture et délai d'accumulation avant commit
+    WRITE_BATCH_MAX = 200
+    WRITE_BATCH_TIMEOUT = 1.0  # secondes
+    # Marqueur placé dans la file par flush() pour valider le lot sans attendre
+    _FLUSH_SENTINEL = object()
+    # Lignes par INSERT multi-valeurs (4 colonnes x 200 < limite de 999 paramètres SQLite)
+    BULK_ROWS_PER_STATEMENT = 200
+    # Au-delà de ce nombre de lignes importées, l'index est reconstruit après l'insertion
+    BULK_REINDEX_MIN_ROWS = 10000
+    # Nombre de tirages normaux précalculés pour la simulation mesure par mesure
+    NORMAL_POOL_SIZE = 4096
+    # Version du schéma (1 : horodatages en secondes Unix)
+    SCHEMA_VERSION = 1
+    # Capacité du tampon de glycémie (une semaine de mesures toutes les 5 minutes)
+    GLUCOSE_BUFFER_SIZE = 2016
+    # Flèches de tendance indexées par classe de variation : forte baisse → forte hausse
+    _TREND_ARROWS = ("↓↓", "↓", "→", "↑", "↑↑")
+    _TREND_TABLE = np.array(_TREND_ARROWS)
+
+    # Requêtes d'insertion préparées une seule fois
+    _SQL_INSERT_GLUCOSE = ("INSERT INTO glucose_measurements "
+                           "(timestamp, blood_glucose, measurement_context, glucose_trend) VALUES (?, ?, ?, ?)")
+    _SQL_INSERT_INSULIN = ("INSERT INTO insulin_doses "
+                           "(timestamp, insulin_type, units, injection_site) VALUES (?, ?, ?, ?)")
+    _SQL_INSERT_MEAL = ("INSERT INTO meals "
+                        "(timestamp, carbs_grams, food_description, estimated_glucose_impact) VALUES (?, ?, ?, ?)")
+    _SQL_INSERT_ALERT = ("INSERT INTO alerts "
+                         "(timestamp, alert_type, message, severity) VALUES (?, ?, ?, ?)")
+    # Index sur l'horodatage (filtres par période et tri des alertes)
+    _SQL_INDEXES = {
+        'glucose': ('ix_glucose_ts', "CREATE INDEX IF NOT EXISTS ix_glucose_ts ON glucose_measurements(timestamp)"),
+        'insulin': ('ix_insulin_ts', "CREATE INDEX IF NOT EXISTS ix_insulin_ts ON insulin_doses(timestamp)"),
+        'meals': ('ix_meals_ts', "CREATE INDEX IF NOT EXISTS ix_meals_ts ON meals(timestamp)"),
+        'alerts': ('ix_alerts_ts', "CREATE INDEX IF NOT EXISTS ix_alerts_ts ON alerts(timestamp DESC)"),
+    }
+
+    # Épisode auquel contribue chaque type d'alerte glycémique (une valeur sévère est aussi une hyperglycémie)
+    _ALERT_EPISODES = {'hypoglycemia': 'hypo', 'hyperglycemia': 'hyper', 'severe_hyperglycemia': 'hyper'}
+    # Types plus graves dont une alerte récente rend la suivante redondante
+    _HIGHER_ALERTS = {'hyperglycemia': ('severe_hyperglycemia',)}
+
+    # Classes prédites par le modèle RandomForest
+    _FORECAST_CLASSES = ("hypoglycémie", "dans la cible", "hyperglycémie")
+
+    # Paramètres de simulation (moyenne, écart-type) par contexte de mesure
+    _SIM_PARAMS_TYPE2 = {'fasting': (100, 20), 'postprandial': (140, 40), 'random': (120, 50)}
+    _SIM_PARAMS_OTHER = {'fasting': (130, 40), 'postprandial': (180, 60), 'random': (160, 80)}
+
+    # Corps des emails d'alerte : patient, type de diabète, sévérité, liste des alertes
+    _EMAIL_BODY_TEMPLATE = """Alerte pour le patient: %s
+Type de diabète: %s
+Niveau de sévérité: %s
+
+Alertes:
+%s
+
+Veuillez prendre les mesures appropriées.
+"""
+
+    _SQL_INSERT = {
+        'glucose': _SQL_INSERT_GLUCOSE,
+        'insulin': _SQL_INSERT_INSULIN,
+        'meals': _SQL_INSERT_MEAL,
+        'alerts': _SQL_INSERT_ALERT,
+    }
+
     def __init__(self, patient_id, patient_name, diabetes_type, config_file="config.json"):
         self.patient_id = patient_id
         self.patient_name = patient_name
         self.diabetes_type = diabetes_type  # 1, 2 ou autre
+        self.config_file = config_file
         self.config = self.load_config(config_file)
+        self._flatten_config()
+        self._sim_params = self._SIM_PARAMS_TYPE2 if diabetes_type == 2 else self._SIM_PARAMS_OTHER
+        self._rng = np.random.default_rng()
+        self._normal_pool = self._rng.standard_normal(self.NORMAL_POOL_SIZE)
+        self._normal_pool_pos = 0
+        self.glucose_buffer = GlucoseBuffer(
+            max(self.GLUCOSE_BUFFER_SIZE, self.window_size))
+        # Profil horaire (somme et nombre de mesures par heure de la journée)
+        self._tod_sum = np.zeros(24, dtype=np.float64)
+        self._tod_cnt = np.zeros(24, dtype=np.int64)
+        self._forecaster = None  # modèle RandomForest, entraîné à la demande
+        self._forecaster_window = None  # taille de fenêtre utilisée pour l'entraînement
+        # Historique en mémoire borné pour les autres paramètres
+        maxlen = self.window_size * 10
         self.data = {
-            'timestamp': [],
-            'blood_glucose': [],
-            'glucose_trend': [],
-            'insulin_dose': [],
-            'carbs_intake': [],
-            'physical_activity': [],
-            'heart_rate': [],
-            'blood_pressure_systolic': [],
-            'blood_pressure_diastolic': [],
-            'weight': [],
-            'ketones': [],
-            'hypo_symptoms': [],
-            'hyper_symptoms': []
+            key: collections.deque(maxlen=maxlen)
+            for key in ('insulin_dose', 'carbs_intake', 'physical_activity', 'heart_rate',
+                        'blood_pressure_systolic', 'blood_pressure_diastolic', 'weight',
+                        'ketones', 'hypo_symptoms', 'hyper_symptoms')
         }
         self.meal_log = []
         self.insulin_log = []
+        # File des écritures traitées par le thread d'écriture
+        self._write_q = queue.Queue()
+        self._db_lock = threading.Lock()
+        self._bulk_sql_cache = {}
+        # Dernières alertes gardées en mémoire pour l'affichage
+        self._recent_alerts = collections.deque(maxlen=5)
+        self.on_alert = None  # callback(timestamp, message) appelé à chaque alerte (secondes Unix)
+        # Agrégation des alertes glycémiques : K franchissements sur N, puis période réfractaire
+        suppression = self.config.get('alert_suppression', {})
+        self._min_crossings = suppression.get('min_crossings', 2)
+        self._suppression_window = suppression.get('window_seconds', 3600)
+        self._alert_cooldown = suppression.get('cooldown_seconds', 900)
+        # L'historique doit pouvoir contenir min_crossings franchissements, sinon aucune alerte ne partirait
+        history_size = max(suppression.get('history_size', 5), self._min_crossings)
+        self._alert_crossings = collections.defaultdict(lambda: collections.deque(maxlen=history_size))
+        self._alert_last_fired = {}
         self.setup_database()
+        self._load_recent_alerts()
+        self._load_tod_profile()
+        self._writer = threading.Thread(target=self._writer_loop, name="sqlite-writer", daemon=True)
+        self._writer.start()
+        # Connexion SMTP persistante et alertes en attente d'envoi groupé
+        self._smtp = None
+        self._email_lock = threading.Lock()
+        self._email_pending = []
+        self._email_timer = None
+        self._last_email_at = None
+        atexit.register(self.close_email)
+        atexit.register(self.flush)
         
     def load_config(self, config_file):
         """Charge la configuration à partir d'un fichier JSON"""
@@ -66,24 +261,54 @@ class DiabeticPatientMonitor:
                     "smtp_port": 587,
                     "sender_email": "",
                     "sender_password": "",
-                    "recipient_emails": []
+                    "recipient_emails": [],
+                    "batch_seconds": 60          # regroupement des alertes dans un même email
                 },
                 "prediction_settings": {
                     "window_size": 10,
-                    "forecast_hours": 4
+                    "forecast_hours": 4,
+                    "method": "context_avg",  # "context_avg" ou "linear"
+                    "decay": 0.7              # poids de la dernière mesure, décroissant par heure
+                },
+                "alert_suppression": {
+                    "min_crossings": 2,        # franchissements requis dans la fenêtre
+                    "window_seconds": 3600,    # fenêtre d'observation
+                    "cooldown_seconds": 900,   # délai minimal entre deux alertes du même type
+                    "history_size": 5          # franchissements mémorisés par type
                 }
             }
     
+    def _flatten_config(self):
+        """Copie les seuils utilisés à chaque mesure dans des attributs directs"""
+        thresholds = self.config['alert_thresholds']
+        self.hypo_thr = thresholds['hypoglycemia']
+        self.hyper_thr = thresholds['hyperglycemia']
+        self.sev_thr = thresholds['severe_hyperglycemia']
+        self.symptoms_thr = thresholds['hypo_symptoms_severity']
+        self.window_size = self.config['prediction_settings']['window_size']
+    
+    def reload_config(self):
+        """Recharge le fichier de configuration et met à jour les seuils"""
+        self.config = self.load_config(self.config_file)
+        self._flatten_config()
+    
     def setup_database(self):
         """Configure la base de données SQLite"""
-        self.conn = sqlite3.connect(f'diabetic_patient_{self.patient_id}.db')
+        # Connexion partagée avec le thread d'écriture, transactions gérées explicitement
+        self.conn = sqlite3.connect(f'diabetic_patient_{self.patient_id}.db',
+                                    check_same_thread=False, isolation_level=None)
         self.cursor = self.conn.cursor()
+        self._write_cursor = self.conn.cursor()
+        
+        # Journal WAL : un fsync par lot plutôt que par ligne
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
         
         # Création des tables spécifiques au diabète
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS glucose_measurements (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
+                timestamp INTEGER NOT NULL,  -- secondes Unix
                 blood_glucose REAL,
                 measurement_context TEXT,  -- à jeun, post-prandial, etc.
                 glucose_trend TEXT
@@ -93,7 +318,7 @@ class DiabeticPatientMonitor:
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS insulin_doses (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
+                timestamp INTEGER NOT NULL,  -- secondes Unix
                 insulin_type TEXT,
                 units REAL,
                 injection_site TEXT
@@ -103,7 +328,7 @@ class DiabeticPatientMonitor:
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS meals (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
+                timestamp INTEGER NOT NULL,  -- secondes Unix
                 carbs_grams REAL,
                 food_description TEXT,
                 estimated_glucose_impact REAL
@@ -113,83 +338,244 @@ class DiabeticPatientMonitor:
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS alerts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
+                timestamp INTEGER NOT NULL,  -- secondes Unix
                 alert_type TEXT,
                 message TEXT,
                 severity TEXT
             )
         ''')
         
+        # Migration des anciens horodatages texte (heure locale) vers des secondes Unix
+        self.cursor.execute("PRAGMA user_version")
+        if self.cursor.fetchone()[0] < self.SCHEMA_VERSION:
+            for table in ('glucose_measurements', 'insulin_doses', 'meals', 'alerts'):
+                self.cursor.execute(f'''
+                    UPDATE {table} SET timestamp = CAST(strftime('%s', timestamp, 'utc') AS INTEGER)
+                    WHERE typeof(timestamp) = 'text'
+                ''')
+            self.cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        
+        for _, create_index in self._SQL_INDEXES.values():
+            self.cursor.execute(create_index)
+        
         self.conn.commit()
     
+    def _load_recent_alerts(self):
+        """Initialise le cache des alertes récentes depuis la base de données"""
+        self.cursor.execute("SELECT timestamp, message FROM alerts ORDER BY timestamp DESC LIMIT ?",
+                            (self._recent_alerts.maxlen,))
+        for timestamp, message in reversed(self.cursor.fetchall()):
+            self._recent_alerts.append((timestamp, message))
+    
+    def _load_tod_profile(self):
+        """Reconstruit le profil horaire de glycémie depuis la base de données"""
+        self.cursor.execute('''
+            SELECT CAST(strftime('%H', timestamp, 'unixepoch', 'localtime') AS INTEGER),
+                   SUM(blood_glucose), COUNT(*)
+            FROM glucose_measurements
+            GROUP BY 1
+        ''')
+        self._tod_sum[:] = 0
+        self._tod_cnt[:] = 0
+        for hour, total, count in self.cursor.fetchall():
+            self._tod_sum[hour] = total
+            self._tod_cnt[hour] = count
+    
+    def recent_alerts(self):
+        """Renvoie les alertes récentes, de la plus récente à la plus ancienne"""
+        return list(reversed(self._recent_alerts))
+    
+    def flush(self):
+        """Attend que toutes les écritures en file soient validées en base"""
+        self._write_q.put(self._FLUSH_SENTINEL)
+        self._write_q.join()
+    
+    def _drain_write_queue(self):
+        """Attend une écriture puis regroupe celles qui arrivent pendant WRITE_BATCH_TIMEOUT"""
+        items = [self._write_q.get()]
+        deadline = time.monotonic() + self.WRITE_BATCH_TIMEOUT
+        while len(items) < self.WRITE_BATCH_MAX and items[-1] is not self._FLUSH_SENTINEL:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._write_q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+    
+    def _writer_loop(self):
+        """Boucle du thread d'écriture : un BEGIN/COMMIT par lot d'enregistrements"""
+        while True:
+            items = self._drain_write_queue()
+            rows_by_table = collections.defaultdict(list)
+            for item in items:
+                if item is not self._FLUSH_SENTINEL:
+                    table, row = item
+                    rows_by_table[table].append(row)
+            
+            try:
+                if not rows_by_table:
+                    continue
+                with self._db_lock:
+                    try:
+                        self._write_batch(rows_by_table)
+                    except Exception as e:
+                        # Le lot est rejoué ligne à ligne pour n'écarter que les enregistrements invalides
+                        if self.conn.in_transaction:
+                            self._write_cursor.execute("ROLLBACK")
+                        print(f"❌ Erreur lors de l'écriture en base: {str(e)}")
+                        try:
+                            self._write_rows_individually(rows_by_table)
+                        except Exception as e:
+                            if self.conn.in_transaction:
+                                self._write_cursor.execute("ROLLBACK")
+                            print(f"❌ Lot d'écriture abandonné: {str(e)}")
+            finally:
+                for _ in items:
+                    self._write_q.task_done()
+    
+    def _write_batch(self, rows_by_table):
+        """Écrit un lot d'enregistrements dans une seule transaction"""
+        self._write_cursor.execute("BEGIN")
+        for table, rows in rows_by_table.items():
+            self._write_cursor.executemany(self._SQL_INSERT[table], rows)
+        self._write_cursor.execute("COMMIT")
+    
+    def _write_rows_individually(self, rows_by_table):
+        """Écrit les lignes une par une en ignorant celles qui échouent"""
+        self._write_cursor.execute("BEGIN")
+        for table, rows in rows_by_table.items():
+            for row in rows:
+                try:
+                    self._write_cursor.execute(self._SQL_INSERT[table], row)
+                except Exception as e:
+                    print(f"❌ Enregistrement ignoré ({table}): {str(e)}")
+        self._write_cursor.execute("COMMIT")
+    
+    def _bulk_insert_sql(self, table, n_rows):
+        """Renvoie (et met en cache) l'INSERT multi-valeurs pour n_rows lignes"""
+        key = (table, n_rows)
+        sql = self._bulk_sql_cache.get(key)
+        if sql is None:
+            prefix, placeholders = self._SQL_INSERT[table].rsplit(" VALUES ", 1)
+            sql = f"{prefix} VALUES {', '.join([placeholders] * n_rows)}"
+            self._bulk_sql_cache[key] = sql
+        return sql
+    
+    def import_history(self, table, rows):
+        """Importe en masse des enregistrements historiques ('glucose', 'insulin', 'meals' ou 'alerts')"""
+        # Chaque ligne suit l'ordre des colonnes de l'INSERT, horodatage en secondes Unix
+        rows = list(rows)
+        if not rows:
+            return 0
+        
+        self.flush()
+        step = self.BULK_ROWS_PER_STATEMENT
+        index_name, create_index = self._SQL_INDEXES[table]
+        rebuild_index = len(rows) >= self.BULK_REINDEX_MIN_ROWS
+        with self._db_lock:
+            try:
+                self.cursor.execute("BEGIN")
+                # Pour un gros import, reconstruire l'index coûte moins que le maintenir ligne à ligne
+                if rebuild_index:
+                    self.cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+                for start in range(0, len(rows), step):
+                    chunk = rows[start:start + step]
+                    params = [value for row in chunk for value in row]
+                    self.cursor.execute(self._bulk_insert_sql(table, len(chunk)), params)
+                if rebuild_index:
+                    self.cursor.execute(create_index)
+                self.cursor.execute("COMMIT")
+            except sqlite3.Error:
+                if self.conn.in_transaction:
+                    self.cursor.execute("ROLLBACK")
+                raise
+            
+            if table == 'glucose':
+                self._load_tod_profile()
+        
+        return len(rows)
+    
     def simulate_glucose_measurement(self, context="random"):
         """Simule une mesure de glycémie basée sur le contexte"""
         # Valeurs basées sur le contexte et le type de diabète
-        if context == "fasting":
-            base_value = 100 if self.diabetes_type == 2 else 130
-            variability = 20 if self.diabetes_type == 2 else 40
-        elif context == "postprandial":
-            base_value = 140 if self.diabetes_type == 2 else 180
-            variability = 40 if self.diabetes_type == 2 else 60
-        else:  # random
-            base_value = 120 if self.diabetes_type == 2 else 160
-            variability = 50 if self.diabetes_type == 2 else 80
-        
-        # Ajouter de la variabilité
-        glucose_value = max(50, min(400, random.normalvariate(base_value, variability)))
+        base_value, variability = self._sim_params.get(context, self._sim_params['random'])
+        
+        # Ajouter de la variabilité (tirage dans la réserve précalculée)
+        if self._normal_pool_pos >= self.NORMAL_POOL_SIZE:
+            self._normal_pool = self._rng.standard_normal(self.NORMAL_POOL_SIZE)
+            self._normal_pool_pos = 0
+        noise = float(self._normal_pool[self._normal_pool_pos])
+        self._normal_pool_pos += 1
+        glucose_value = max(50.0, min(400.0, base_value + variability * noise))
         
         # Déterminer la tendance
-        if len(self.data['blood_glucose']) > 0:
-            last_reading = self.data['blood_glucose'][-1]
-            if glucose_value > last_reading + 15:
-                trend = "↑↑"  # Forte augmentation
-            elif glucose_value > last_reading + 5:
-                trend = "↑"   # Légère augmentation
-            elif glucose_value < last_reading - 15:
-                trend = "↓↓"  # Forte diminution
-            elif glucose_value < last_reading - 5:
-                trend = "↓"   # Légère diminution
-            else:
-                trend = "→"   # Stable
+        last_reading = self.glucose_buffer.last_value()
+        if last_reading is not None:
+            trend = self._classify_trend(glucose_value - last_reading)
         else:
             trend = "→"
         
         return round(glucose_value, 1), trend
     
+    def simulate_batch(self, n, context="random"):
+        """Simule n mesures de glycémie et leurs tendances en opérations vectorisées"""
+        base_value, variability = self._sim_params.get(context, self._sim_params['random'])
+        glucose = np.clip(self._rng.normal(base_value, variability, n), 50.0, 400.0).astype(np.float32)
+        glucose = np.round(glucose, 1)
+        return glucose, self.compute_trends(glucose, previous=self.glucose_buffer.last_value())
+    
+    @classmethod
+    def _classify_trend(cls, delta):
+        """Convertit une variation de glycémie (mg/dL) en flèche de tendance"""
+        return cls._TREND_ARROWS[2 + (delta > 5) + (delta > 15) - (delta < -5) - (delta < -15)]
+    
+    @classmethod
+    def compute_trends(cls, glucose, previous=None):
+        """Calcule les tendances d'une série de glycémies en une seule opération vectorisée"""
+        glucose = np.asarray(glucose, dtype=np.float64)
+        if glucose.size == 0:
+            return np.empty(0, dtype=cls._TREND_TABLE.dtype)
+        # La première tendance se compare à la mesure précédente si elle est connue
+        deltas = np.diff(glucose, prepend=glucose[0] if previous is None else previous)
+        # Les mesures sont au 0,1 mg/dL près : arrondir évite les écarts de représentation aux seuils
+        deltas = np.round(deltas, 1)
+        idx = 2 + (deltas > 5).astype(np.intp) + (deltas > 15) - (deltas < -5) - (deltas < -15)
+        return cls._TREND_TABLE[idx]
+    
+    def current_trend(self):
+        """Recalcule la tendance à partir des deux dernières mesures"""
+        last_two = self.glucose_buffer.last(2)
+        if len(last_two) < 2:
+            return "→"
+        return self._classify_trend(float(last_two[1] - last_two[0]))
+    
     def log_glucose_measurement(self, context="random"):
         """Enregistre une mesure de glycémie"""
         glucose_value, trend = self.simulate_glucose_measurement(context)
-        current_time = datetime.now()
+        current_time = int(time.time())
         
         # Ajouter aux données en mémoire
-        self.data['timestamp'].append(current_time)
-        self.data['blood_glucose'].append(glucose_value)
-        self.data['glucose_trend'].append(trend)
-        
-        # Sauvegarder dans la base de données
-        self.cursor.execute('''
-            INSERT INTO glucose_measurements (timestamp, blood_glucose, measurement_context, glucose_trend)
-            VALUES (?, ?, ?, ?)
-        ''', (current_time, glucose_value, context, trend))
+        self.glucose_buffer.append(current_time, glucose_value)
+        hour = time.localtime(current_time).tm_hour
+        self._tod_sum[hour] += glucose_value
+        self._tod_cnt[hour] += 1
         
-        self.conn.commit()
+        # Sauvegarder dans la base de données (thread d'écriture)
+        self._write_q.put(('glucose', (current_time, glucose_value, context, trend)))
         
         # Vérifier les alertes
-        self.check_glucose_alerts(glucose_value)
+        self.check_glucose_alerts(glucose_value, current_time)
         
         return glucose_value, trend
     
     def log_insulin_dose(self, insulin_type, units, injection_site="abdomen"):
         """Enregistre une dose d'insuline"""
-        current_time = datetime.now()
+        current_time = int(time.time())
         
-        # Sauvegarder dans la base de données
-        self.cursor.execute('''
-            INSERT INTO insulin_doses (timestamp, insulin_type, units, injection_site)
-            VALUES (?, ?, ?, ?)
-        ''', (current_time, insulin_type, units, injection_site))
-        
-        self.conn.commit()
+        # Sauvegarder dans la base de données (thread d'écriture)
+        self._write_q.put(('insulin', (current_time, insulin_type, units, injection_site)))
         
         # Ajouter aux données en mémoire
         self.data['insulin_dose'].append(units)
@@ -198,18 +584,13 @@ class DiabeticPatientMonitor:
     
     def log_meal(self, carbs_grams, food_description=""):
         """Enregistre un repas"""
-        current_time = datetime.now()
+        current_time = int(time.time())
         
         # Estimer l'impact sur la glycémie (simplifié)
         estimated_impact = carbs_grams / 10  # Impact approximatif en mg/dL
         
-        # Sauvegarder dans la base de données
-        self.cursor.execute('''
-            INSERT INTO meals (timestamp, carbs_grams, food_description, estimated_glucose_impact)
-            VALUES (?, ?, ?, ?)
-        ''', (current_time, carbs_grams, food_description, estimated_impact))
-        
-        self.conn.commit()
+        # Sauvegarder dans la base de données (thread d'écriture)
+        self._write_q.put(('meals', (current_time, carbs_grams, food_description, estimated_impact)))
         
         # Ajouter aux données en mémoire
         self.data['carbs_intake'].append(carbs_grams)
@@ -222,28 +603,54 @@ class DiabeticPatientMonitor:
         
         if symptom_type == "hypo":
             self.data['hypo_symptoms'].append(severity)
-            if severity >= self.config['alert_thresholds']['hypo_symptoms_severity']:
+            if severity >= self.symptoms_thr:
                 self.send_alert("hypo_symptoms", f"Symptômes d'hypoglycémie sévères (niveau {severity}/10)")
         else:
             self.data['hyper_symptoms'].append(severity)
-            if severity >= self.config['alert_thresholds']['hypo_symptoms_severity']:
+            if severity >= self.symptoms_thr:
                 self.send_alert("hyper_symptoms", f"Symptômes d'hyperglycémie sévères (niveau {severity}/10)")
         
         return True
     
-    def check_glucose_alerts(self, glucose_value):
-        """Vérifie les alertes basées sur la glycémie"""
-        thresholds = self.config['alert_thresholds']
+    def check_glucose_alerts(self, glucose_value, timestamp=None):
+        """Vérifie les alertes basées sur la glycémie (timestamp en secondes Unix)"""
+        timestamp = timestamp or int(time.time())
         
-        if glucose_value < thresholds['hypoglycemia']:
-            self.send_alert("hypoglycemia", f"Hypoglycémie détectée: {glucose_value} mg/dL")
+        if glucose_value < self.hypo_thr:
+            alert_type, message = "hypoglycemia", f"Hypoglycémie détectée: {glucose_value} mg/dL"
         
-        elif glucose_value > thresholds['severe_hyperglycemia']:
-            self.send_alert("severe_hyperglycemia", f"Hyperglycémie sévère: {glucose_value} mg/dL")
+        elif glucose_value > self.sev_thr:
+            alert_type, message = "severe_hyperglycemia", f"Hyperglycémie sévère: {glucose_value} mg/dL"
         
-        elif glucose_value > thresholds['hyperglycemia']:
-            self.send_alert("hyperglycemia", f"Hyperglycémie: {glucose_value} mg/dL")
+        elif glucose_value > self.hyper_thr:
+            alert_type, message = "hyperglycemia", f"Hyperglycémie: {glucose_value} mg/dL"
+        
+        else:
+            return True
         
+        if self._should_fire(alert_type, timestamp, glucose_value):
+            self.send_alert(alert_type, message)
+        
+        return True
+    
+    def _should_fire(self, alert_type, timestamp, glucose_value):
+        """Agrège les franchissements de seuil et supprime les alertes en double"""
+        crossings = self._alert_crossings[self._ALERT_EPISODES[alert_type]]
+        crossings.append((timestamp, glucose_value))
+        
+        # Exiger plusieurs franchissements dans la fenêtre d'observation
+        window_start = timestamp - self._suppression_window
+        if sum(1 for ts, _ in crossings if ts >= window_start) < self._min_crossings:
+            return False
+        
+        # Ignorer l'alerte pendant la période réfractaire de ce type ou d'un type plus grave ;
+        # une aggravation reste signalée même si l'alerte moins grave est en période réfractaire
+        for suppressing_type in (alert_type,) + self._HIGHER_ALERTS.get(alert_type, ()):
+            last_fired_at = self._alert_last_fired.get(suppressing_type)
+            if last_fired_at is not None and timestamp - last_fired_at < self._alert_cooldown:
+                return False
+        
+        self._alert_last_fired[alert_type] = timestamp
         return True
     
     def send_alert(self, alert_type, message):
@@ -255,118 +662,244 @@ class DiabeticPatientMonitor:
             severity = "medium"
         
         # Enregistrer l'alerte dans la base de données
-        current_time = datetime.now()
-        self.cursor.execute('''
-            INSERT INTO alerts (timestamp, alert_type, message, severity)
-            VALUES (?, ?, ?, ?)
-        ''', (current_time, alert_type, message, severity))
+        current_time = int(time.time())
+        self._write_q.put(('alerts', (current_time, alert_type, message, severity)))
         
-        self.conn.commit()
+        self._recent_alerts.append((current_time, message))
+        if self.on_alert is not None:
+            self.on_alert(current_time, message)
         
         # Afficher dans la console
-        print(f"🔴 ALERTE: {message} - {current_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🔴 ALERTE: {message} - {datetime.fromtimestamp(current_time).strftime('%Y-%m-%d %H:%M:%S')}")
         
         # Envoyer par email si configuré
         if self.config['email_alerts']['enabled']:
             self.send_email_alert(message, severity)
     
     def send_email_alert(self, message, severity):
-        """Envoie une alerte par email"""
-        try:
-            sender_email = self.config['email_alerts']['sender_email']
-            sender_password = self.config['email_alerts']['sender_password']
-            recipient_emails = self.config['email_alerts']['recipient_emails']
+        """Envoie une alerte par email, regroupée avec celles émises dans la même fenêtre"""
+        batch_window = self.config['email_alerts'].get('batch_seconds', 60)
+        with self._email_lock:
+            self._email_pending.append((datetime.now(), severity, message))
+            if self._email_timer is not None:
+                return  # un envoi groupé est déjà programmé
             
-            if not sender_email or not recipient_emails:
+            wait = 0
+            if self._last_email_at is not None:
+                wait = self._last_email_at + batch_window - time.monotonic()
+            if wait > 0:
+                self._email_timer = threading.Timer(wait, self._send_pending_emails)
+                self._email_timer.daemon = True
+                self._email_timer.start()
+                return
+        
+        self._send_pending_emails()
+    
+    def _send_pending_emails(self):
+        """Envoie en un seul email toutes les alertes en attente"""
+        with self._email_lock:
+            pending, self._email_pending = self._email_pending, []
+            self._email_timer = None
+            if not pending:
                 return
             
-            # Création du message
-            email_message = MIMEMultipart()
-            email_message['From'] = sender_email
-            email_message['To'] = ", ".join(recipient_emails)
-            email_message['Subject'] = f"Alerte Diabète - {self.patient_name} - {severity.upper()}"
-            
-            body = f"""
-            Alerte pour le patient: {self.patient_name}
-            Type de diabète: {self.diabetes_type}
-            Niveau de sévérité: {severity.upper()}
-            Message: {message}
-            Horodatage: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            
-            Veuillez prendre les mesures appropriées.
-            """
-            email_message.attach(MIMEText(body, 'plain'))
-            
-            # Connexion au serveur SMTP et envoi
-            with smtplib.SMTP(self.config['email_alerts']['smtp_server'], 
-                             self.config['email_alerts']['smtp_port']) as server:
-                server.starttls()
-                server.login(sender_email, sender_password)
-                server.sendmail(sender_email, recipient_emails, email_message.as_string())
+            try:
+                sender_email = self.config['email_alerts']['sender_email']
+                recipient_emails = self.config['email_alerts']['recipient_emails']
                 
-            print("📧 Email d'alerte envoyé avec succès")
-            
-        except Exception as e:
-            print(f"❌ Erreur lors de l'envoi de l'email: {str(e)}")
+                if not sender_email or not recipient_emails:
+                    return
+                
+                # Création du message
+                severity = "high" if any(sev == "high" for _, sev, _ in pending) else "medium"
+                lines = "\n".join(f"- {ts.strftime('%Y-%m-%d %H:%M:%S')} [{sev.upper()}] {msg}"
+                                   for ts, sev, msg in pending)
+                body = self._EMAIL_BODY_TEMPLATE % (self.patient_name, self.diabetes_type, severity.upper(), lines)
+                email_message = MIMEText(body, 'plain', 'utf-8')
+                email_message['From'] = sender_email
+                email_message['To'] = ", ".join(recipient_emails)
+                email_message['Subject'] = f"Alerte Diabète - {self.patient_name} - {severity.upper()}"
+                
+                # Envoi sur la connexion persistante, reconnexion unique en cas de coupure
+                for attempt in range(2):
+                    try:
+                        self._smtp_connection().sendmail(sender_email, recipient_emails, email_message.as_string())
+                        break
+                    except (smtplib.SMTPServerDisconnected, ConnectionError):
+                        self._close_smtp()
+                        if attempt:
+                            raise
+                
+                self._last_email_at = time.monotonic()
+                print(f"📧 Email d'alerte envoyé avec succès ({len(pending)} alerte(s))")
+                
+            except Exception as e:
+                self._close_smtp()
+                print(f"❌ Erreur lors de l'envoi de l'email: {str(e)}")
+    
+    def _smtp_connection(self):
+        """Renvoie la connexion SMTP, établie (STARTTLS + login) au premier envoi"""
+        if self._smtp is None:
+            settings = self.config['email_alerts']
+            server = smtplib.SMTP(settings['smtp_server'], settings['smtp_port'])
+            server.starttls()
+            server.login(settings['sender_email'], settings['sender_password'])
+            self._smtp = server
+        return self._smtp
+    
+    def _close_smtp(self):
+        """Ferme la connexion SMTP si elle est ouverte"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+    
+    def close_email(self):
+        """Envoie les alertes en attente et ferme la connexion SMTP"""
+        timer = self._email_timer
+        if timer is not None:
+            timer.cancel()
+        self._send_pending_emails()
+        with self._email_lock:
+            self._close_smtp()
+    
+    def _predict_linear(self, hours):
+        """Prévision par régression linéaire sur la fenêtre de mesures récentes"""
+        # Préparer les données pour la prédiction (vue sur le tampon, sans copie)
+        window_size = self.window_size
+        glucose_data = self.glucose_buffer.last(window_size)
+        
+        # Régression linéaire simple par moindres carrés (forme fermée)
+        y = glucose_data
+        n = len(y)
+        x = np.arange(n, dtype=np.float64)
+        x_mean = x.mean()
+        y_mean = y.mean(dtype=np.float64)
+        x_var = ((x - x_mean) ** 2).sum()
+        slope = ((x - x_mean) * (y - y_mean)).sum() / x_var if x_var else 0.0
+        intercept = y_mean - slope * x_mean
+        
+        # Prédire les prochaines heures
+        return slope * np.arange(n, n + hours) + intercept
+    
+    def _predict_context_avg(self, hours):
+        """Prévision Context-AVG : dernière mesure mélangée à la moyenne horaire historique"""
+        decay = self.config['prediction_settings'].get('decay', 0.7)
+        last = self.glucose_buffer.last_value()
+        horizons = np.arange(1, hours + 1)
+        slots = (datetime.now().hour + horizons) % 24
+        
+        # Moyenne de l'heure visée, ou dernière mesure si cette heure n'a jamais été observée
+        counts = self._tod_cnt[slots]
+        tod_mean = np.divide(self._tod_sum[slots], counts,
+                             out=np.full(hours, last, dtype=np.float64), where=counts > 0)
+        
+        # Le poids de la dernière mesure décroît exponentiellement avec l'horizon
+        alpha = decay ** horizons
+        return alpha * last + (1 - alpha) * tod_mean
     
     def predict_glucose_trend(self, hours=4):
         """Prédit l'évolution de la glycémie"""
-        if len(self.data['blood_glucose']) < self.config['prediction_settings']['window_size']:
+        if len(self.glucose_buffer) < self.window_size:
             return "Données insuffisantes pour la prédiction"
         
-        # Préparer les données pour la prédiction
-        window_size = self.config['prediction_settings']['window_size']
-        glucose_data = self.data['blood_glucose'][-window_size:]
-        
-        # Créer un modèle de régression linéaire simple
-        X = np.arange(len(glucose_data)).reshape(-1, 1)
-        y = np.array(glucose_data)
-        
-        # Entraîner le modèle
-        from sklearn.linear_model import LinearRegression
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Prédire les prochaines heures
-        future_X = np.arange(len(glucose_data), len(glucose_data) + hours).reshape(-1, 1)
-        predictions = model.predict(future_X)
+        if self.config['prediction_settings'].get('method', 'context_avg') == 'linear':
+            predictions = self._predict_linear(hours)
+        else:
+            predictions = self._predict_context_avg(hours)
         
         # Vérifier les alertes potentielles
         alerts = []
         for i, pred in enumerate(predictions):
-            if pred < self.config['alert_thresholds']['hypoglycemia']:
+            if pred < self.hypo_thr:
                 alerts.append(f"Hypoglycémie prévue dans {i+1} heures ({pred:.1f} mg/dL)")
-            elif pred > self.config['alert_thresholds']['severe_hyperglycemia']:
+            elif pred > self.sev_thr:
                 alerts.append(f"Hyperglycémie sévère prévue dans {i+1} heures ({pred:.1f} mg/dL)")
         
         if alerts:
-            return "\n".join(alerts)
+            result = "\n".join(alerts)
+        else:
+            result = "Aucune anomalie glycémique prévue dans les prochaines heures"
+        
+        forecast = self._forecast_next_reading()
+        if forecast:
+            result += f"\n{forecast}"
         
-        return "Aucune anomalie glycémique prévue dans les prochaines heures"
+        return result
+    
+    def _forecast_next_reading(self):
+        """Classe prévue par le modèle RandomForest pour la prochaine mesure, si utilisable"""
+        # Un modèle entraîné avec une autre taille de fenêtre (configuration rechargée) est ignoré
+        if self._forecaster is None or self._forecaster_window != self.window_size:
+            return None
+        
+        window = self.glucose_buffer.last(self._forecaster_window)
+        if len(window) < self._forecaster_window:
+            return None
+        
+        next_class = int(self._forecaster.predict(window.reshape(1, -1))[0])
+        return f"Prochaine mesure (RandomForest): {self._FORECAST_CLASSES[next_class]}"
+    
+    def train_forecaster(self):
+        """Entraîne un classifieur RandomForest sur l'historique (scikit-learn est optionnel)"""
+        try:
+            from sklearn.ensemble import RandomForestClassifier
+            from sklearn.model_selection import train_test_split
+        except ImportError:
+            return "scikit-learn n'est pas installé : entraînement impossible"
+        
+        self.flush()
+        with self._db_lock:
+            df = pd.read_sql_query("SELECT blood_glucose FROM glucose_measurements ORDER BY timestamp", self.conn)
+        
+        glucose = df['blood_glucose'].to_numpy(dtype=np.float32)
+        window_size = self.window_size
+        if len(glucose) < window_size + 20:
+            return "Données insuffisantes pour l'entraînement"
+        
+        # Chaque fenêtre de mesures prédit la classe de la mesure suivante
+        X = np.lib.stride_tricks.sliding_window_view(glucose[:-1], window_size)
+        next_values = glucose[window_size:]
+        y = (next_values >= self.hypo_thr).astype(np.int64) + (next_values > self.hyper_thr)
+        
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=0)
+        model = RandomForestClassifier(n_estimators=100, random_state=0)
+        model.fit(X_train, y_train)
+        self._forecaster = model
+        self._forecaster_window = window_size
+        
+        return f"Modèle entraîné sur {len(X_train)} fenêtres - précision: {model.score(X_test, y_test):.0%}"
     
     def generate_diabetes_report(self, hours=24):
         """Génère un rapport complet pour le diabète"""
         # Récupérer les données de la base de données
-        query = f"""
+        self.flush()
+        query = """
         SELECT timestamp, blood_glucose, measurement_context, glucose_trend 
         FROM glucose_measurements 
-        WHERE timestamp >= datetime('now', '-{hours} hours')
+        WHERE timestamp >= ?
         ORDER BY timestamp
         """
-        df_glucose = pd.read_sql_query(query, self.conn)
+        since = int(time.time()) - hours * 3600
+        with self._db_lock:
+            df_glucose = pd.read_sql_query(query, self.conn, params=(since,))
         
         if df_glucose.empty:
             return "Aucune donnée de glycémie disponible pour cette période"
         
-        # Calculer les statistiques
-        mean_glucose = df_glucose['blood_glucose'].mean()
-        min_glucose = df_glucose['blood_glucose'].min()
-        max_glucose = df_glucose['blood_glucose'].max()
+        # Statistiques et épisodes d'hypo et d'hyperglycémie en un seul parcours
+        g = df_glucose['blood_glucose'].to_numpy(dtype=np.float32)
+        (hypo_episodes, hyper_episodes, severe_hyper_episodes, mean_glucose, min_glucose, max_glucose,
+         range_exits, in_range) = scan_glucose(g, self.hypo_thr, self.hyper_thr, self.sev_thr)
         
-        # Compter les épisodes d'hypo et d'hyperglycémie
-        hypo_episodes = len(df_glucose[df_glucose['blood_glucose'] < self.config['alert_thresholds']['hypoglycemia']])
-        hyper_episodes = len(df_glucose[df_glucose['blood_glucose'] > self.config['alert_thresholds']['hyperglycemia']])
-        severe_hyper_episodes = len(df_glucose[df_glucose['blood_glucose'] > self.config['alert_thresholds']['severe_hyperglycemia']])
+        # Variabilité glycémique sur fenêtre glissante d'une heure
+        ser = df_glucose.set_index(pd.to_datetime(df_glucose['timestamp'], unit='s'))['blood_glucose']
+        roll = ser.rolling('1h')
+        cv = (roll.std() / roll.mean()).mean()
+        cv_text = "n/d" if np.isnan(cv) else f"{cv * 100:.1f} %"
+        time_in_range = in_range / len(g)
         
         # Générer le rapport
         report = f"""
@@ -380,9 +913,14 @@ Valeurs glycémiques:
 - Maximum: {max_glucose:.1f} mg/dL
 
 Épisodes:
-- Hypoglycémie (<{self.config['alert_thresholds']['hypoglycemia']} mg/dL): {hypo_episodes}
-- Hyperglycémie (>{self.config['alert_thresholds']['hyperglycemia']} mg/dL): {hyper_episodes}
-- Hyperglycémie sévère (>{self.config['alert_thresholds']['severe_hyperglycemia']} mg/dL): {severe_hyper_episodes}
+- Hypoglycémie (<{self.hypo_thr} mg/dL): {hypo_episodes}
+- Hyperglycémie (>{self.hyper_thr} mg/dL): {hyper_episodes}
+- Hyperglycémie sévère (>{self.sev_thr} mg/dL): {severe_hyper_episodes}
+- Sorties de la plage cible: {range_exits}
+
+Variabilité:
+- Coefficient de variation (fenêtre 1 h): {cv_text}
+- Temps dans la cible ({self.hypo_thr}-{self.hyper_thr} mg/dL): {time_in_range * 100:.1f} %
 
 Prédiction:
 {self.predict_glucose_trend()}
@@ -396,32 +934,51 @@ Objectifs thérapeutiques:
         
         return report
     
-    def plot_glucose_data(self, hours=24):
+    def plot_glucose_data(self, hours=24, max_points=2000):
         """Crée un graphique des données de glycémie"""
         # Récupérer les données
-        query = f"""
-        SELECT timestamp, blood_glucose 
-        FROM glucose_measurements 
-        WHERE timestamp >= datetime('now', '-{hours} hours')
-        ORDER BY timestamp
-        """
-        df = pd.read_sql_query(query, self.conn)
+        self.flush()
+        since = int(time.time()) - hours * 3600
+        with self._db_lock:
+            self.cursor.execute("SELECT COUNT(*) FROM glucose_measurements WHERE timestamp >= ?", (since,))
+            row_count = self.cursor.fetchone()[0]
+            
+            if row_count > max_points:
+                # Sous-échantillonnage par SQLite : moyenne par intervalle de bucket_seconds
+                bucket_seconds = max(1, hours * 3600 // max_points)
+                query = """
+                SELECT timestamp / ? * ? AS timestamp, AVG(blood_glucose) AS blood_glucose
+                FROM glucose_measurements 
+                WHERE timestamp >= ?
+                GROUP BY 1
+                ORDER BY 1
+                """
+                df = pd.read_sql_query(query, self.conn, params=(bucket_seconds, bucket_seconds, since))
+            else:
+                query = """
+                SELECT timestamp, blood_glucose 
+                FROM glucose_measurements 
+                WHERE timestamp >= ?
+                ORDER BY timestamp
+                """
+                df = pd.read_sql_query(query, self.conn, params=(since,))
+        
+        # Convertir les secondes Unix en heure locale pour l'affichage
+        local_tz = datetime.now().astimezone().tzinfo
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s', utc=True).dt.tz_convert(local_tz).dt.tz_localize(None)
         
         if df.empty:
             print("Aucune donnée à afficher pour cette période.")
             return
         
-        # Convertir le timestamp
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
         # Créer le graphique
         plt.figure(figsize=(12, 6))
-        plt.plot(df['timestamp'], df['blood_glucose'], 'b-', label='Glycémie (mg/dL)')
+        plt.plot(df['timestamp'], df['blood_glucose'], 'b-', label='Glycémie (mg/dL)', rasterized=True)
         
         # Ajouter les lignes de référence
-        plt.axhline(y=self.config['alert_thresholds']['hypoglycemia'], color='r', linestyle='--', label='Seuil hypoglycémie')
-        plt.axhline(y=self.config['alert_thresholds']['hyperglycemia'], color='orange', linestyle='--', label='Seuil hyperglycémie')
-        plt.axhline(y=self.config['alert_thresholds']['severe_hyperglycemia'], color='purple', linestyle='--', label='Seuil hyperglycémie sévère')
+        plt.axhline(y=self.hypo_thr, color='r', linestyle='--', label='Seuil hypoglycémie')
+        plt.axhline(y=self.hyper_thr, color='orange', linestyle='--', label='Seuil hyperglycémie')
+        plt.axhline(y=self.sev_thr, color='purple', linestyle='--', label='Seuil hyperglycémie sévère')
         
         plt.ylabel('Glycémie (mg/dL)')
         plt.title(f'Surveillance Glycémique - {self.patient_name}')
@@ -458,7 +1015,8 @@ class DiabetesMonitoringGUI:
         
         ttk.Label(main_frame, textvariable=self.glucose_var, font=('Arial', 16, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=5)
         ttk.Label(main_frame, textvariable=self.trend_var, font=('Arial', 12)).grid(row=2, column=0, sticky=tk.W, pady=5)
-        ttk.Label(main_frame, textvariable=self.status_var, font=('Arial', 12)).grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.status_label = ttk.Label(main_frame, textvariable=self.status_var, font=('Arial', 12))
+        self.status_label.grid(row=3, column=0, sticky=tk.W, pady=5)
         
         # Boutons pour différentes actions
         ttk.Button(main_frame, text="Mesure Glycémie", command=self.measure_glucose).grid(row=1, column=1, pady=5, padx=5)
@@ -466,12 +1024,16 @@ class DiabetesMonitoringGUI:
         ttk.Button(main_frame, text="Enregistrer Insuline", command=self.log_insulin).grid(row=3, column=1, pady=5, padx=5)
         ttk.Button(main_frame, text="Rapport Complet", command=self.show_report).grid(row=4, column=0, pady=10)
         ttk.Button(main_frame, text="Graphique Glycémie", command=self.show_glucose_plot).grid(row=4, column=1, pady=10)
+        ttk.Button(main_frame, text="Entraîner Prévision", command=self.train_forecaster).grid(row=6, column=0, columnspan=2, pady=5)
         
         # Zone de texte pour les alertes
         self.alert_text = tk.Text(main_frame, height=10, width=50)
         self.alert_text.grid(row=5, column=0, columnspan=2, pady=10)
-        self.alert_text.insert(tk.END, "Aucune alerte pour le moment\n")
         self.alert_text.config(state=tk.DISABLED)
+        self.update_alert_display()
+        
+        # Rafraîchir les alertes uniquement lorsqu'une nouvelle est émise
+        self.monitor.on_alert = self.update_alert_display
         
         # Configuration de la mise à jour automatique
         self.update_interval = 30000  # 30 secondes
@@ -545,13 +1107,13 @@ class DiabetesMonitoringGUI:
         self.trend_var.set(f"Tendance: {trend}")
         
         # Déterminer le statut
-        if glucose_value < self.monitor.config['alert_thresholds']['hypoglycemia']:
+        if glucose_value < self.monitor.hypo_thr:
             status = "HYPOGLYCÉMIE - Prendre du sucre"
             color = "red"
-        elif glucose_value > self.monitor.config['alert_thresholds']['severe_hyperglycemia']:
+        elif glucose_value > self.monitor.sev_thr:
             status = "HYPERGLYCÉMIE SÉVÈRE - Contacter médecin"
             color = "purple"
-        elif glucose_value > self.monitor.config['alert_thresholds']['hyperglycemia']:
+        elif glucose_value > self.monitor.hyper_thr:
             status = "Hyperglycémie - Surveiller"
             color = "orange"
         else:
@@ -559,25 +1121,21 @@ class DiabetesMonitoringGUI:
             color = "green"
         
         self.status_var.set(f"Statut: {status}")
-        self.status_label = ttk.Label(self.root, textvariable=self.status_var, foreground=color)
-        self.status_label.grid(row=3, column=0, sticky=tk.W, pady=5)
-        
-        self.update_alert_display()
+        self.status_label.configure(foreground=color)
     
-    def update_alert_display(self):
+    def update_alert_display(self, *_):
         """Met à jour l'affichage des alertes"""
-        # Récupérer les alertes de la base de données
-        query = "SELECT timestamp, message FROM alerts ORDER BY timestamp DESC LIMIT 5"
-        df_alerts = pd.read_sql_query(query, self.monitor.conn)
+        # Les alertes récentes sont gardées en mémoire par le moniteur
+        alerts = self.monitor.recent_alerts()
         
         self.alert_text.config(state=tk.NORMAL)
         self.alert_text.delete(1.0, tk.END)
         
-        if df_alerts.empty:
+        if not alerts:
             self.alert_text.insert(tk.END, "Aucune alerte pour le moment\n")
         else:
-            for _, row in df_alerts.iterrows():
-                self.alert_text.insert(tk.END, f"{row['timestamp']} - {row['message']}\n")
+            for timestamp, message in alerts:
+                self.alert_text.insert(tk.END, f"{datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
         
         self.alert_text.config(state=tk.DISABLED)
     
@@ -596,6 +1154,11 @@ class DiabetesMonitoringGUI:
         """Affiche le graphique de glycémie"""
         self.monitor.plot_glucose_data(24)
     
+    def train_forecaster(self):
+        """Entraîne le modèle de prévision à la demande"""
+        result = self.monitor.train_forecaster()
+        messagebox.showinfo("Prévision", result)
+    
     def update_display(self):
         """Met à jour périodiquement l'affichage"""
         # Pour la démonstration, on prend une mesure aléatoire périodiquement